@@ -17,68 +17,56 @@ def main():
         reader = csv.DictReader(f)
         for row in reader:
             proteins.append(row["uniprot_id"])
-    proteins_str = ", ".join([f"'uniprot_protein:{x}'" for x in proteins])
 
     details = defaultdict(dict)
     with sqlite3.connect(args.db) as conn:
         cur = conn.cursor()
 
-        # First get the labels, i.e. the recommended names
-        print("Getting recommended names...")
-        cur.execute(
-            f"""SELECT DISTINCT s1.subject, s2.value
-                FROM statements s1
-                  JOIN statements s2 ON s1.object = s2.subject
-                WHERE s1.subject IN ({proteins_str})
-                  AND s1.predicate = 'uniprot_core:recommendedName'
-                  AND s2.predicate = 'uniprot_core:fullName';"""
+        # Load the protein IDs into a temporary table to join the statements against
+        cur.execute("CREATE TEMP TABLE protein (subject TEXT PRIMARY KEY)")
+        cur.executemany(
+            "INSERT OR IGNORE INTO protein VALUES (?)",
+            [(f"uniprot_protein:{x}",) for x in proteins],
         )
-        for res in cur.fetchall():
-            uniprot = res[0].split(":")[1]
-            details[uniprot] = {"label": res[1]}
 
-        # Then get the short labels, i.e. the gene names
-        print("Getting genes...")
+        # Get the labels (recommended names), short labels (gene names),
+        # and synonyms (alternative names - there may be zero or more)
+        # in a single pass over the statements
+        print("Getting names, genes, and alternative names...")
         cur.execute(
-            f"""SELECT DISTINCT s1.subject, s2.value
-                FROM statements s1
+            """SELECT DISTINCT s1.subject, s1.predicate, s2.value
+                FROM protein p
+                  JOIN statements s1 ON s1.subject = p.subject
                   JOIN statements s2 ON s1.object = s2.subject
-                WHERE s1.subject IN ({proteins_str})
-                  AND s1.predicate = 'uniprot_core:encodedBy'
-                  AND s2.predicate = 'skos:prefLabel'"""
+                WHERE (s1.predicate IN (
+                      'uniprot_core:recommendedName',
+                      'uniprot_core:alternativeName'
+                    )
+                    AND s2.predicate = 'uniprot_core:fullName')
+                  OR (s1.predicate = 'uniprot_core:encodedBy'
+                    AND s2.predicate = 'skos:prefLabel');"""
         )
-        for res in cur.fetchall():
-            uniprot = res[0].split(":")[1]
-            if uniprot not in details:
-                details[uniprot] = {}
-            details[uniprot]["short_label"] = res[1]
-
-        # Finally get the synonyms - there may be zero or more
         synonyms = defaultdict(list)
-        print("Getting alternative names...")
-        cur.execute(
-            f"""SELECT DISTINCT s1.subject, s2.value
-                FROM statements s1
-                  JOIN statements s2 ON s1.object = s2.subject
-                WHERE s1.subject IN ({proteins_str})
-                  AND s1.predicate = 'uniprot_core:alternativeName'
-                  AND s2.predicate = 'uniprot_core:fullName';"""
-        )
-        for res in cur.fetchall():
+        for res in cur:
             uniprot = res[0].split(":")[1]
-            if uniprot not in synonyms:
-                synonyms[uniprot] = list()
-            synonyms[uniprot].append(res[1])
+            if res[1] == "uniprot_core:recommendedName":
+                details[uniprot]["label"] = res[2]
+            elif res[1] == "uniprot_core:encodedBy":
+                details[uniprot]["short_label"] = res[2]
+            else:
+                synonyms[uniprot].append(res[2])
 
         for uniprot, syns in synonyms.items():
-            details[uniprot]["synonyms"] = "|".join(syns)
+            details[uniprot]["synonyms"] = "|".join(sorted(syns))
 
     missing = list(set(proteins) - set(details.keys()))
     if missing:
         print(f"WARNING: Missing {len(missing)} protein(s): " + ", ".join(missing))
 
+    # Sort rows by UniProt ID (and synonyms above by value)
+    # so the output does not depend on query order
     rows = []
-    for uniprot, det in details.items():
+    for uniprot, det in sorted(details.items()):
         det["uniprot_id"] = "uniprot:" + uniprot
         det["parent"] = "PR:000000001"
         rows.append(det)
@@ -1,13 +1,30 @@
 #!/usr/bin/env python3
 
+import hashlib
+import os
+import time
+
 import gizmos.tree
 import gizmos.search
 
 from flask import Flask, request, render_template, Response
 from terminology import search, term
+from terminology.terminology import CMI_PB_DB
 
 app = Flask(__name__)
 
+# Changes on every restart, so deploys that change rendering invalidate ETags
+STARTED = time.time()
+
+
+def get_etag():
+    """Return an ETag for the current request.
+    Pages only change when the database is rebuilt or the server is restarted,
+    so the start time, database modification time, and request path are enough."""
+    mtime = os.path.getmtime(CMI_PB_DB)
+    key = f"{STARTED} {mtime} {request.full_path}".encode()
+    return hashlib.blake2b(key, digest_size=16).hexdigest()
+
 
 @app.route("/hook", methods=["POST"])
 def update():
@@ -18,7 +35,13 @@ def update():
 @app.route("/")
 @app.route("/<term_id>")
 def cmi(term_id=None):
-    if request.args and "text" in request.args:
-        return search(request.args["text"])
+    etag = get_etag()
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    elif request.args and "text" in request.args:
+        response = Response(search(request.args["text"]), mimetype="application/json")
     else:
-        return term(term_id)
+        response = Response(term(term_id))
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, max-age=0, must-revalidate"
+    return response
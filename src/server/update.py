@@ -7,10 +7,15 @@
 # Link to the latest version.
 
 import os
+import re
 import requests
 
+from contextlib import suppress
 from datetime import datetime
 
+ETAG_RE = re.compile(r"^etag:(.*)$", re.IGNORECASE | re.MULTILINE)
+
+
 def update(url, path, keep_num=10):
     """Given a remote URL, a local file path,
     and an optional number of versions to keep,
@@ -22,47 +27,78 @@ def update(url, path, keep_num=10):
     directory, filename = os.path.split(path)
     directory = directory or "."
     basename, extension = os.path.splitext(filename)
+    if os.path.lexists(path) and not os.path.islink(path):
+        raise FileExistsError(f"Refusing to replace {path}: it exists and is not a symlink")
 
     # Script configuration
     header = os.path.join(directory, "header.txt")
     etag = ""
     if os.path.exists(header) and os.path.islink(path):
         with open(header) as f:
-            for line in f:
-                if line.lower().startswith("etag:"):
-                    etag = line[5:].strip()
-                    break
+            match = ETAG_RE.search(f.read())
+        if match:
+            etag = match.group(1).strip()
 
     date = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
     timestamped_path = os.path.join(directory, f"{basename}-{date}{extension}")
+    # Temporary names in the same directory, so that os.replace is an atomic rename
+    partial_path = os.path.join(directory, f".{basename}-{date}{extension}.part")
+    link_path = os.path.join(directory, f".{filename}.link")
+    header_path = os.path.join(directory, ".header.txt.part")
+
+    with requests.get(url, headers={"If-None-Match": etag}, stream=True) as response:
+        # Not modified: keep the current headers, link, and versions
+        if response.status_code == 304:
+            return
+        response.raise_for_status()
 
-    response = requests.get(url, headers={
-        "If-None-Match": etag
-    })
-    with open(header, "w") as f:
-        for k, v in response.headers.items():
-            f.write(f"{k}: {v}\n")
+        # Stream the body to disk in chunks,
+        # only creating the file if there is any content
+        chunks = response.iter_content(chunk_size=1024 * 1024)
+        chunk = next(chunks, b"")
+        if chunk:
+            try:
+                with open(partial_path, "wb") as f:
+                    f.write(chunk)
+                    for chunk in chunks:
+                        f.write(chunk)
+                os.replace(partial_path, timestamped_path)
+            except BaseException:
+                with suppress(FileNotFoundError):
+                    os.remove(partial_path)
+                raise
 
-    if response.content:
-        with open(timestamped_path, "wb") as f:
-            f.write(response.content)
-    elif response.text:
-        with open(timestamped_path, "w") as f:
-            f.write(response.text)
+            # Only save the new ETag once its file is complete,
+            # so an interrupted download is retried next time
+            with open(header_path, "w") as f:
+                for k, v in response.headers.items():
+                    f.write(f"{k}: {v}\n")
+            os.replace(header_path, header)
 
+    # Swap the old link for the new one in one step,
+    # so the path never points to a missing or partial file
     if os.path.exists(timestamped_path):
-        if os.path.islink(path):
-            os.unlink(path)
-        os.symlink(timestamped_path, path)
+        if os.path.lexists(link_path):
+            os.unlink(link_path)
+        try:
+            os.symlink(os.path.basename(timestamped_path), link_path)
+            os.replace(link_path, path)
+        except BaseException:
+            with suppress(FileNotFoundError):
+                os.remove(link_path)
+            raise
 
-    names = []
-    for name in os.listdir(directory):
-        if os.path.isfile(name) and name.startswith(f"{basename}-"):
-            names.append(name)
-    names.sort()
-    names.reverse()
-    for name in names[keep_num:]:
-        os.remove(name)
+    with os.scandir(directory) as entries:
+        versions = [
+            entry
+            for entry in entries
+            if entry.is_file(follow_symlinks=False)
+            and entry.name.startswith(f"{basename}-")
+            and entry.name.endswith(extension)
+        ]
+    versions.sort(key=lambda entry: entry.name, reverse=True)
+    for entry in versions[keep_num:]:
+        os.remove(entry.path)
 
 
 if __name__ == "__main__":
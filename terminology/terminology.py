@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 
+import os
 import gizmos.tree
 import gizmos.search
 
+from functools import lru_cache
+
 CMI_PB_DB = "build/cmi-pb.db"
 
 # Predicates to display in browser
@@ -30,12 +33,21 @@ SYNONYMS = [
     "oio:hasRelatedSynonym",
 ]
 
+# The cached helpers below take the database modification time as an argument.
+# It is only used as part of the cache key, so a rebuilt database gets fresh results.
+
 
 def search(text, db=None):
     """Search for a term in CMI-PB based on the text label.
     Return the results in JSON format for Typeahead search."""
     if not db:
         db = CMI_PB_DB
+    return _search(db, os.path.getmtime(db), text)
+
+
+@lru_cache(maxsize=1024)
+def _search(db, mtime, text):
+    """Search the database as it was at the given modification time."""
     return gizmos.search.search(db, text, short_label="CMI-PB:alternativeTerm", synonyms=SYNONYMS)
 
 
@@ -49,6 +61,12 @@ def term(term_id, db=None):
     If term_id is None, return the top-level."""
     if not db:
         db = CMI_PB_DB
+    return _term(db, os.path.getmtime(db), term_id)
+
+
+@lru_cache(maxsize=512)
+def _term(db, mtime, term_id):
+    """Return the HTML tree browser from the database as it was at the given modification time."""
     return gizmos.tree.tree(
         db,
         term_id,